@@ -1,58 +1,224 @@
-import http.server
-import socketserver
 import json
+import sys
+from types import MappingProxyType
 from xml.etree.ElementTree import Element, SubElement, tostring
-import xml.dom.minidom
-from typing import Optional, Union, List
-import logging
+from xml.etree.ElementTree import indent as xml_indent
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, TextIO, Tuple, Union
 
-# Настройка логирования
-logging.basicConfig(level=logging.INFO)
+# Таблица экранирования текста (str.translate работает на уровне C)
+_ESCAPE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"})
+
+# Форма тега, определяемая один раз при создании
+_SINGLE, _CHILDREN, _TEXT = range(3)
+
+# Общий пул строк атрибутов: одинаковые наборы атрибутов у разных тегов
+# сериализуются один раз. Размер ограничен, чтобы уникальные значения
+# (src, alt, href) не накапливались бесконечно
+_ATTR_POOL: Dict[Tuple[Tuple[str, str], ...], str] = {}
+_ATTR_POOL_LIMIT = 4096
+
+# Таблица готовых отступов, растёт по мере необходимости
+_INDENTS = [""]
+
+def _indent(level: int) -> str:
+    while len(_INDENTS) <= level:
+        _INDENTS.append(_INDENTS[-1] + "  ")
+    return _INDENTS[level]
+
+# Размер буфера для записи файлов (1 МиБ)
+_BUFFER_SIZE = 1024 * 1024
 
 # Утилита для очистки атрибутов
 def clean_attributes(attributes):
-    return {key.rstrip('_'): value for key, value in attributes.items()}
+    # Ключи всегда интернируются: имена-идентификаторы из **kwargs уже
+    # интернированы, а data-*/aria-* из **{"data-id": 1} и обрезанные rstrip — нет.
+    # Если все ключи чистые и интернированные, словарь возвращается без копирования
+    for key in attributes:
+        if key[-1:] == "_" or key is not sys.intern(key):
+            break
+    else:
+        return attributes
+    return {sys.intern(key.rstrip('_')): value for key, value in attributes.items()}
+
+# Содержимое тега: текст, вложенный тег, последовательность детей или любое
+# значение, выводимое через str() (например, число) — поэтому object
+_Content = object
+_Children = Sequence[object]
 
 # Базовый класс HTML-тега
 class Tag:
-    def __init__(self, name: str, content: Optional[Union[str, List['Tag']]] = None,
-                 is_single: bool = False, **attributes: str):
-        self.name = name
-        self.content = content or ""
-        self.is_single = is_single
-        self.attributes = clean_attributes(attributes)
-
-    def __str__(self):
-        attrs = " ".join(f'{key}="{value}"' for key, value in self.attributes.items())
-        if attrs:
-            attrs = " " + attrs
-        if self.is_single:
-            return f"<{self.name}{attrs} />"
-        if isinstance(self.content, list):
-            inner = "".join(map(str, self.content))
-            return f"<{self.name}{attrs}>{inner}</{self.name}>"
-        return f"<{self.name}{attrs}>{self.content}</{self.name}>"
-
-    def render(self, indent=0) -> str:
-        space = "  " * indent
-        attrs = " ".join(f'{key}="{value}"' for key, value in self.attributes.items())
-        if attrs:
-            attrs = " " + attrs
-        if self.is_single:
-            return f"{space}<{self.name}{attrs} />"
-        if isinstance(self.content, list):
-            inner = "\n".join(
-                child.render(indent + 1) if isinstance(child, Tag) else f"{space}  {child}"
-                for child in self.content
-            )
-            return f"{space}<{self.name}{attrs}>\n{inner}\n{space}</{self.name}>"
-        return f"{space}<{self.name}{attrs}>{self.content}</{self.name}>"
+    __slots__ = ("name", "_content", "_is_single", "raw", "_attributes", "_attr_cache", "_kind")
+
+    # Точные типы полей — класс готов к AOT-компиляции (mypyc)
+    name: str
+    _content: _Content
+    _is_single: bool
+    raw: bool
+    # Значения атрибутов — любые объекты (width=500, hidden=True), в разметку
+    # они попадают через str()
+    _attributes: Dict[str, object]
+    _attr_cache: Optional[str]
+    _kind: int
+
+    def __init__(self, name: str, content: Optional[_Content] = None,
+                 is_single: bool = False, raw: bool = False, **attributes: object):
+        self.name = sys.intern(name)
+        self._content = "" if content is None else content
+        self._is_single = is_single
+        self.raw = raw
+        self._attributes = clean_attributes(attributes)
+        self._attr_cache = None
+        self._reshape()
+
+    # Обходчик ветвится по готовой форме, а не по isinstance на каждом узле;
+    # форма пересчитывается при любой замене content или is_single
+    def _reshape(self) -> None:
+        if self._is_single:
+            self._kind = _SINGLE
+        elif isinstance(self._content, (list, tuple)):
+            self._kind = _CHILDREN
+        else:
+            self._kind = _TEXT
+
+    @property
+    def content(self) -> _Content:
+        return self._content
+
+    @content.setter
+    def content(self, value: _Content) -> None:
+        self._content = value
+        self._reshape()
+
+    @property
+    def is_single(self) -> bool:
+        return self._is_single
+
+    @is_single.setter
+    def is_single(self, value: bool) -> None:
+        self._is_single = value
+        self._reshape()
+
+    # Добавление дочернего элемента: кортеж детей превращается в список
+    # только при первой модификации
+    def append(self, child: object) -> None:
+        content = self._content
+        if isinstance(content, list):
+            children = content
+        elif isinstance(content, tuple):
+            children = list(content)
+        else:
+            children = [content] if content != "" else []
+        children.append(child)
+        self.content = children
+
+    # Атрибуты снаружи доступны только для чтения: изменения идут через
+    # присваивание или set_attribute, которые сбрасывают кэш строки атрибутов
+    @property
+    def attributes(self) -> Mapping[str, object]:
+        return MappingProxyType(self._attributes)
+
+    @attributes.setter
+    def attributes(self, value: Mapping[str, object]) -> None:
+        self._attributes = {sys.intern(key): item for key, item in value.items()}
+        self._attr_cache = None
+
+    def set_attribute(self, key: str, value: object) -> None:
+        self._attributes[sys.intern(key)] = value
+        self._attr_cache = None
+
+    # Строка атрибутов (с ведущим пробелом) вычисляется один раз на тег
+    def _attrs(self) -> str:
+        cache = self._attr_cache
+        if cache is None:
+            # Ключ строится из строковых значений: 1, True и 1.0 не должны
+            # делить одну запись, а списки и прочие нехешируемые значения допустимы
+            key = tuple((name, str(value)) for name, value in self._attributes.items())
+            cache = _ATTR_POOL.get(key)
+            if cache is None:
+                cache = "".join(f' {name}="{value}"' for name, value in key)
+                if len(_ATTR_POOL) < _ATTR_POOL_LIMIT:
+                    _ATTR_POOL[key] = cache
+            self._attr_cache = cache
+        return cache
+
+    def __str__(self) -> str:
+        buf: List[str] = []
+        self._emit(buf.append)
+        return "".join(buf)
+
+    def render(self, indent: int = 0) -> str:
+        buf: List[str] = []
+        self._emit(buf.append, indent)
+        return "".join(buf)
+
+    # Запись разметки напрямую в файл, без построения итоговой строки
+    def render_into(self, file: TextIO, indent: Optional[int] = 0) -> None:
+        self._emit(file.write, indent)
+
+    # Обход дерева без рекурсии: все фрагменты передаются в один приёмник
+    # (list.append или file.write). indent=None — компактный вывод,
+    # иначе — с отступами от уровня indent
+    def _emit(self, append: Callable[[str], object], indent: Optional[int] = None) -> None:
+        pretty = indent is not None
+        stack: List[Tuple[Union[Tag, str], int]] = [(self, indent or 0)]
+        while stack:
+            node, level = stack.pop()
+            if not isinstance(node, Tag):
+                append(node)
+                continue
+            name = node.name
+            space = _indent(level) if pretty else ""
+            if space:
+                append(space)
+            append("<")
+            append(name)
+            append(node._attrs())
+            kind = node._kind
+            if kind == _SINGLE:
+                append(" />")
+            elif kind == _CHILDREN:
+                # Аннотация без cast: на горячем пути нет вызовов typing
+                children: _Children = node._content  # type: ignore[assignment]
+                if not children:
+                    # Пустой список детей выводится так же, как пустой текст
+                    append("></")
+                    append(name)
+                    append(">")
+                elif pretty:
+                    append(">\n")
+                    stack.append(("\n" + space + "</" + name + ">", level))
+                else:
+                    append(">")
+                    stack.append(("</" + name + ">", level))
+                for i, child in enumerate(reversed(children)):
+                    if pretty and i:
+                        stack.append(("\n", level))
+                    if isinstance(child, Tag):
+                        stack.append((child, level + 1))
+                    else:
+                        # Экранируется только текст; прочие значения выводятся через str()
+                        text = child.translate(_ESCAPE) if isinstance(child, str) and not node.raw else str(child)
+                        stack.append((_indent(level + 1) + text if pretty else text, level))
+            else:
+                append(">")
+                content = node._content
+                if isinstance(content, Tag):
+                    # Тег, переданный как содержимое, выводится в строку без отступов
+                    content._emit(append)
+                elif isinstance(content, str) and not node.raw:
+                    append(content.translate(_ESCAPE))
+                else:
+                    append(str(content))
+                append("</")
+                append(name)
+                append(">")
 
 
 # Универсальная функция для создания HTML-тега
-def tag(name: str, *children, is_single=False, **attributes) -> Tag:
-    content = list(children) if children else None
-    return Tag(name, content, is_single, **attributes)
+def tag(name: str, *children, is_single=False, raw=False, **attributes) -> Tag:
+    # Дети всегда передаются кортежем (возможно, пустым), чтобы форма тега
+    # не зависела от их наличия
+    return Tag(name, children, is_single, raw, **attributes)
 
 # Удобные функции для создания тегов
 def html(*children): return tag("html", *children)
@@ -70,74 +236,100 @@ def br(**attributes): return tag("br", is_single=True, **attributes)
 def link(href, rel="stylesheet", **attributes): return tag("link", is_single=True, href=href, rel=rel, **attributes)
 def script(content=None, src=None, **attributes):
     if src: return tag("script", "", src=src, **attributes)
-    return tag("script", content, **attributes)
-def style(content): return tag("style", content)
+    return tag("script", content, raw=True, **attributes)
+def style(content): return tag("style", content, raw=True)
 
 # Макросы (компоненты)
+# Атрибуты компонентов заданы заранее в очищенном виде (без class_),
+# чтобы clean_attributes не копировал словарь на каждом вызове
+_CARD_ATTRS = {"class": "card"}
+_CARD_IMG_ATTRS = {"class": "card-img"}
+_CARD_TITLE_ATTRS = {"class": "card-title"}
+_CARD_CONTENT_ATTRS = {"class": "card-content"}
+_NAV_BRAND_ATTRS = {"class": "navbar-brand"}
+_NAV_ITEM_ATTRS = {"class": "navbar-item"}
+
 def card(title, content, image_src):
     return div(
-        img(src=image_src, alt=title, class_="card-img"),
-        h1(title, class_="card-title"),
-        p(content, class_="card-content"),
-        class_="card"
+        img(src=image_src, alt=title, **_CARD_IMG_ATTRS),
+        h1(title, **_CARD_TITLE_ATTRS),
+        p(content, **_CARD_CONTENT_ATTRS),
+        **_CARD_ATTRS
     )
 
 def navbar(brand, *links, class_="navbar"):
     return div(
-        tag("span", brand, class_="navbar-brand"),
-        ul(*(li(a(link_text, href=href), class_="navbar-item") for href, link_text in links)),
+        tag("span", brand, **_NAV_BRAND_ATTRS),
+        ul(*[li(a(link_text, href=href), **_NAV_ITEM_ATTRS) for href, link_text in links]),
         class_=class_
     )
 
 # Генерация JSON
 def generate_json(data, filename):
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=4)
+    with open(filename, "w", encoding="utf-8", buffering=_BUFFER_SIZE) as f:
+        f.write(json.dumps(data, ensure_ascii=False, indent=4))
 
 # Генерация XML
 def generate_xml(root_name, data, filename):
-    def build_xml_tree(parent, data):
-        if isinstance(data, dict):
-            for key, value in data.items():
-                child = SubElement(parent, key)
-                build_xml_tree(child, value)
-        elif isinstance(data, list):
-            for item in data:
-                item_element = SubElement(parent, "item")
-                build_xml_tree(item_element, item)
-        else:
-            parent.text = str(data)
-
     root = Element(root_name)
-    build_xml_tree(root, data)
+    # Обход без рекурсии: элементы создаются сразу, поэтому порядок сохраняется
+    stack = [(root, data)]
+    while stack:
+        parent, node = stack.pop()
+        if isinstance(node, dict):
+            for key, value in node.items():
+                stack.append((SubElement(parent, key), value))
+        elif isinstance(node, list):
+            for item in node:
+                stack.append((SubElement(parent, "item"), item))
+        else:
+            parent.text = str(node)
 
-    xml_string = tostring(root, encoding="unicode")
-    pretty_xml = xml.dom.minidom.parseString(xml_string).toprettyxml()
+    xml_indent(root, space="  ")
+    pretty_xml = tostring(root, encoding="unicode", xml_declaration=True)
 
-    with open(filename, "w", encoding="utf-8") as f:
+    with open(filename, "w", encoding="utf-8", buffering=_BUFFER_SIZE) as f:
         f.write(pretty_xml)
 
-# Функция для сохранения HTML в файл
-def save_html(filename, content: Tag):
-    with open(filename, "w", encoding="utf-8") as f:
-        f.write(content.render())
+# Функция для сохранения HTML в файл (по умолчанию — минифицированный вывод,
+# pretty=True — с отступами для отладки)
+def save_html(filename, content: Tag, pretty: bool = False):
+    with open(filename, "w", encoding="utf-8", buffering=_BUFFER_SIZE) as f:
+        content.render_into(f, 0 if pretty else None)
+
+# Обработчик статики с отключённым алгоритмом Нейгла для мелких ответов.
+# Сервер принимает любой вызываемый объект вместо класса обработчика, поэтому
+# здесь обходимся функцией: вложенный подкласс не компилируется mypyc, а
+# импорт http.server остаётся ленивым
+def _no_delay_handler(request, client_address, server):
+    import http.server
+    import socket
+
+    request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return http.server.SimpleHTTPRequestHandler(request, client_address, server)
 
 # Запуск локального сервера
 def start_server(directory="."):
+    # Серверные модули импортируются только здесь, чтобы не замедлять import
+    import http.server
+    import logging
+
+    # Настройка логирования
+    logging.basicConfig(level=logging.INFO)
+
     PORT = 8000
-    handler = http.server.SimpleHTTPRequestHandler
-    with socketserver.TCPServer(("", PORT), handler) as httpd:
+    with http.server.ThreadingHTTPServer(("", PORT), _no_delay_handler) as httpd:
         logging.info(f"Сервер запущен на http://localhost:{PORT}")
         httpd.serve_forever()
 
 # Функция для генерации CSS
 def generate_css(filename, styles):
-    with open(filename, "w", encoding="utf-8") as f:
+    with open(filename, "w", encoding="utf-8", buffering=_BUFFER_SIZE) as f:
         f.write(styles)
 
 # Функция для генерации JS
 def generate_js(filename, scripts):
-    with open(filename, "w", encoding="utf-8") as f:
+    with open(filename, "w", encoding="utf-8", buffering=_BUFFER_SIZE) as f:
         f.write(scripts)
 
 # Пример использования